@@ -1,3 +1,3 @@
-from . import build_pack, sign_pack, verify_pack
+from . import build_pack, master_store, scan_catalog, sign_pack, verify_pack
 
-__all__ = ["build_pack", "sign_pack", "verify_pack"]
+__all__ = ["build_pack", "master_store", "scan_catalog", "sign_pack", "verify_pack"]
@@ -4,10 +4,11 @@ from __future__ import annotations
 import csv
 import hashlib
 import json
+import os
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 ROOT = Path(__file__).resolve().parent
 DATA_DIR = ROOT / "data"
@@ -30,44 +31,45 @@ def _to_bool(value: str) -> bool:
   return value.strip().lower() in {"1", "true", "yes"}
 
 
-def _read_additives() -> Dict[str, AdditiveRow]:
+def _csv_rows(name: str) -> Iterator[Dict[str, str]]:
+  with (DATA_DIR / name).open(newline="", encoding="utf-8") as handle:
+    yield from csv.DictReader(handle)
+
+
+def _read_additives(rows: Iterable[Dict[str, str]]) -> Dict[str, AdditiveRow]:
   additives: Dict[str, AdditiveRow] = {}
-  with (DATA_DIR / "additives.csv").open(newline="", encoding="utf-8") as handle:
-    reader = csv.DictReader(handle)
-    for row in reader:
-      code = row["code"].strip().upper()
-      additives[code] = AdditiveRow(
-        code=code,
-        additive_class=row["class"].strip(),
-        evidence_level=row["evidence_level"].strip(),
-        plain_summary=row["plain_summary"].strip(),
-        dietary={
-          "vegan": _to_bool(row["dietary_vegan"]),
-          "vegetarian": _to_bool(row["dietary_vegetarian"]),
-          "kosher": _to_bool(row["dietary_kosher"]),
-          "halal": _to_bool(row["dietary_halal"]),
-        },
-        source={
-          "animal": _to_bool(row["source_animal"]),
-          "insect": _to_bool(row["source_insect"]),
-          "plant": _to_bool(row["source_plant"]),
-          "synthetic": _to_bool(row["source_synthetic"]),
-        },
-      )
+  for row in rows:
+    code = row["code"].strip().upper()
+    additives[code] = AdditiveRow(
+      code=code,
+      additive_class=row["class"].strip(),
+      evidence_level=row["evidence_level"].strip(),
+      plain_summary=row["plain_summary"].strip(),
+      dietary={
+        "vegan": _to_bool(row["dietary_vegan"]),
+        "vegetarian": _to_bool(row["dietary_vegetarian"]),
+        "kosher": _to_bool(row["dietary_kosher"]),
+        "halal": _to_bool(row["dietary_halal"]),
+      },
+      source={
+        "animal": _to_bool(row["source_animal"]),
+        "insect": _to_bool(row["source_insect"]),
+        "plant": _to_bool(row["source_plant"]),
+        "synthetic": _to_bool(row["source_synthetic"]),
+      },
+    )
   return additives
 
 
-def _read_synonyms(additives: Dict[str, AdditiveRow]) -> Dict[str, str]:
+def _read_synonyms(rows: Iterable[Dict[str, str]], additives: Dict[str, AdditiveRow]) -> Dict[str, str]:
   alias_index: Dict[str, str] = {}
-  with (DATA_DIR / "synonyms.csv").open(newline="", encoding="utf-8") as handle:
-    reader = csv.DictReader(handle)
-    for row in reader:
-      code = row["code"].strip().upper()
-      if code not in additives:
-        raise ValueError(f"Synonym references unknown code {code}")
-      name = row["name"].strip().upper()
-      additives[code].names.append(name)
-      alias_index[name] = code
+  for row in rows:
+    code = row["code"].strip().upper()
+    if code not in additives:
+      raise ValueError(f"Synonym references unknown code {code}")
+    name = row["name"].strip().upper()
+    additives[code].names.append(name)
+    alias_index[name] = code
   for code, additive in additives.items():
     additive.names.append(code)
     alias_index[code] = code
@@ -75,20 +77,18 @@ def _read_synonyms(additives: Dict[str, AdditiveRow]) -> Dict[str, str]:
   return alias_index
 
 
-def _read_references(additives: Dict[str, AdditiveRow]) -> None:
-  with (DATA_DIR / "references.csv").open(newline="", encoding="utf-8") as handle:
-    reader = csv.DictReader(handle)
-    for row in reader:
-      code = row["code"].strip().upper()
-      if code not in additives:
-        raise ValueError(f"Reference references unknown code {code}")
-      additives[code].references.append(
-        {
-          "id": row["reference_id"].strip(),
-          "label": row["label"].strip(),
-          "url": row["url"].strip(),
-        }
-      )
+def _read_references(rows: Iterable[Dict[str, str]], additives: Dict[str, AdditiveRow]) -> None:
+  for row in rows:
+    code = row["code"].strip().upper()
+    if code not in additives:
+      raise ValueError(f"Reference references unknown code {code}")
+    additives[code].references.append(
+      {
+        "id": row["reference_id"].strip(),
+        "label": row["label"].strip(),
+        "url": row["url"].strip(),
+      }
+    )
 
 
 def _parse_audience(value: str) -> List[str]:
@@ -97,86 +97,85 @@ def _parse_audience(value: str) -> List[str]:
   return [item.strip().title() for item in value.split("|") if item.strip()]
 
 
-def _read_region_rules(additives: Dict[str, AdditiveRow]) -> None:
-  with (DATA_DIR / "region_rules.csv").open(newline="", encoding="utf-8") as handle:
-    reader = csv.DictReader(handle)
-    for row in reader:
-      code = row["code"].strip().upper()
-      if code not in additives:
-        raise ValueError(f"Region rule references unknown code {code}")
-      region = row["region"].strip().upper()
-      audience = _parse_audience(row["audience"].strip()) if row["audience"] else []
-      reference_ids = [item.strip() for item in row["reference_ids"].split("|") if item.strip()]
-      rule_type = row["type"].strip()
-      rule: Dict[str, object]
-      if rule_type == "regulatory_warning":
-        rule = {
-          "id": row["rule_id"].strip(),
-          "type": "regulatory_warning",
-          "summary": row["summary"].strip(),
-          "audience": audience,
-          "referenceIds": reference_ids,
-        }
-      elif rule_type == "population_caution":
-        rule = {
-          "id": row["rule_id"].strip(),
-          "type": "population_caution",
-          "summary": row["summary"].strip(),
-          "audience": audience,
-          "condition": row["diet_or_condition"].strip().lower(),
-          "severity": row["severity"].strip().lower(),
-          "referenceIds": reference_ids,
-        }
-      elif rule_type == "diet_conflict":
-        rule = {
-          "id": row["rule_id"].strip(),
-          "type": "diet_conflict",
-          "summary": row["summary"].strip(),
-          "audience": audience,
-          "diet": row["diet_or_condition"].strip().lower(),
-          "referenceIds": reference_ids,
-        }
-      elif rule_type == "evidence_annotation":
-        rule = {
-          "id": row["rule_id"].strip(),
-          "type": "evidence_annotation",
-          "summary": row["summary"].strip(),
-          "audience": audience,
-          "severity": row["severity"].strip().lower(),
-          "referenceIds": reference_ids,
-        }
-      elif rule_type == "region_approval":
-        rule = {
-          "id": row["rule_id"].strip(),
-          "type": "region_approval",
-          "summary": row["summary"].strip(),
-          "audience": audience,
-          "approved": row["severity"].strip().lower() != "red",
-          "referenceIds": reference_ids,
-        }
-      else:
-        raise ValueError(f"Unknown rule type {rule_type}")
-
-      additive = additives[code]
-      additive.region_rules.setdefault(region, []).append(rule)
+def _read_region_rules(rows: Iterable[Dict[str, str]], additives: Dict[str, AdditiveRow]) -> None:
+  for row in rows:
+    code = row["code"].strip().upper()
+    if code not in additives:
+      raise ValueError(f"Region rule references unknown code {code}")
+    region = row["region"].strip().upper()
+    audience = _parse_audience(row["audience"].strip()) if row["audience"] else []
+    reference_ids = [item.strip() for item in row["reference_ids"].split("|") if item.strip()]
+    rule_type = row["type"].strip()
+    rule: Dict[str, object]
+    if rule_type == "regulatory_warning":
+      rule = {
+        "id": row["rule_id"].strip(),
+        "type": "regulatory_warning",
+        "summary": row["summary"].strip(),
+        "audience": audience,
+        "referenceIds": reference_ids,
+      }
+    elif rule_type == "population_caution":
+      rule = {
+        "id": row["rule_id"].strip(),
+        "type": "population_caution",
+        "summary": row["summary"].strip(),
+        "audience": audience,
+        "condition": row["diet_or_condition"].strip().lower(),
+        "severity": row["severity"].strip().lower(),
+        "referenceIds": reference_ids,
+      }
+    elif rule_type == "diet_conflict":
+      rule = {
+        "id": row["rule_id"].strip(),
+        "type": "diet_conflict",
+        "summary": row["summary"].strip(),
+        "audience": audience,
+        "diet": row["diet_or_condition"].strip().lower(),
+        "referenceIds": reference_ids,
+      }
+    elif rule_type == "evidence_annotation":
+      rule = {
+        "id": row["rule_id"].strip(),
+        "type": "evidence_annotation",
+        "summary": row["summary"].strip(),
+        "audience": audience,
+        "severity": row["severity"].strip().lower(),
+        "referenceIds": reference_ids,
+      }
+    elif rule_type == "region_approval":
+      rule = {
+        "id": row["rule_id"].strip(),
+        "type": "region_approval",
+        "summary": row["summary"].strip(),
+        "audience": audience,
+        "approved": row["severity"].strip().lower() != "red",
+        "referenceIds": reference_ids,
+      }
+    else:
+      raise ValueError(f"Unknown rule type {rule_type}")
+
+    additive = additives[code]
+    additive.region_rules.setdefault(region, []).append(rule)
 
   for additive in additives.values():
     for rules in additive.region_rules.values():
       rules.sort(key=lambda entry: entry["id"])  # type: ignore[index]
 
 
-def build_pack() -> None:
-  OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
-  additives = _read_additives()
-  alias_index = _read_synonyms(additives)
-  _read_references(additives)
-  _read_region_rules(additives)
-
-  version = datetime.now(timezone.utc).strftime("%Y.%m.%d")
-  generated_at = datetime.now(timezone.utc).isoformat()
+def materialize(
+  additive_rows: Iterable[Dict[str, str]],
+  synonym_rows: Iterable[Dict[str, str]],
+  reference_rows: Iterable[Dict[str, str]],
+  rule_rows: Iterable[Dict[str, str]],
+) -> Tuple[List[Dict[str, object]], Dict[str, str]]:
+  """Turns source rows into sorted payload entries and the alias index."""
+  additives = _read_additives(additive_rows)
+  alias_index = _read_synonyms(synonym_rows, additives)
+  _read_references(reference_rows, additives)
+  _read_region_rules(rule_rows, additives)
 
-  additives_payload = [
+  additives_payload: List[Dict[str, object]] = [
     {
       "code": additive.code,
       "names": additive.names,
@@ -191,8 +190,17 @@ def build_pack() -> None:
     }
     for additive in sorted(additives.values(), key=lambda item: item.code)
   ]
+  return additives_payload, alias_index
+
+
+def stamp_pack(
+  additives_payload: List[Dict[str, object]], alias_index: Dict[str, str]
+) -> Tuple[Dict[str, object], Dict[str, object]]:
+  """Stamps and checksums a materialized pack; returns (payload, meta)."""
+  version = datetime.now(timezone.utc).strftime("%Y.%m.%d")
+  generated_at = datetime.now(timezone.utc).isoformat()
 
-  payload = {
+  payload: Dict[str, object] = {
     "version": version,
     "generated_at": generated_at,
     "additives": additives_payload,
@@ -203,18 +211,41 @@ def build_pack() -> None:
   checksum = hashlib.sha256(serialized).hexdigest()
   payload["checksum"] = checksum
 
-  (OUTPUT_DIR / "payload.json").write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
-
-  regions = sorted({region for additive in additives_payload for region in additive["region_rules"].keys()})
-  meta = {
+  regions = sorted({region for additive in additives_payload for region in additive["region_rules"].keys()})  # type: ignore[attr-defined]
+  meta: Dict[str, object] = {
     "version": version,
     "regions": regions,
     "checksum": checksum,
     "signature": None,
     "diff_from": None,
   }
-  (OUTPUT_DIR / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
-  print(f"Built pack version {version} with {len(additives_payload)} additives")
+  return payload, meta
+
+
+def write_pack(payload: Dict[str, object], meta: Dict[str, object]) -> None:
+  """Writes payload.json and meta.json, each through a temp file and rename."""
+  OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+  staged = [
+    (OUTPUT_DIR / "payload.json", json.dumps(payload, indent=2, ensure_ascii=False)),
+    (OUTPUT_DIR / "meta.json", json.dumps(meta, indent=2)),
+  ]
+  for path, text in staged:
+    path.with_suffix(".json.tmp").write_text(text, encoding="utf-8")
+  # Rename only once both files are staged so readers never see a partial pack file.
+  for path, _ in staged:
+    os.replace(path.with_suffix(".json.tmp"), path)
+
+
+def build_pack() -> None:
+  additives_payload, alias_index = materialize(
+    _csv_rows("additives.csv"),
+    _csv_rows("synonyms.csv"),
+    _csv_rows("references.csv"),
+    _csv_rows("region_rules.csv"),
+  )
+  payload, meta = stamp_pack(additives_payload, alias_index)
+  write_pack(payload, meta)
+  print(f"Built pack version {payload['version']} with {len(additives_payload)} additives")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,269 @@
+"""SQLite additive master store with CSV import and incremental pack builds."""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from . import build_pack
+from .build_pack import DATA_DIR, OUTPUT_DIR
+
+DEFAULT_DB_PATH = DATA_DIR / "master.sqlite3"
+NOW = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+ADDITIVE_COLUMNS = [
+  "code",
+  "class",
+  "evidence_level",
+  "plain_summary",
+  "dietary_vegan",
+  "dietary_vegetarian",
+  "dietary_kosher",
+  "dietary_halal",
+  "source_animal",
+  "source_insect",
+  "source_plant",
+  "source_synthetic",
+]
+
+# Child tables keep the CSV column names so rows feed build_pack unchanged.
+# Each entry maps table -> (csv file, key columns, value columns).
+CHILD_TABLES: Dict[str, Tuple[str, List[str], List[str]]] = {
+  "synonyms": ("synonyms.csv", ["code", "name"], []),
+  "additive_references": ("references.csv", ["code", "reference_id"], ["label", "url"]),
+  "region_rules": (
+    "region_rules.csv",
+    ["code", "region", "rule_id"],
+    ["type", "severity", "diet_or_condition", "audience", "summary", "reference_ids"],
+  ),
+}
+
+
+class MasterStoreError(RuntimeError):
+  pass
+
+
+def _quoted(columns: Sequence[str]) -> str:
+  return ", ".join(f'"{column}"' for column in columns)
+
+
+def _schema() -> str:
+  additive_values = ",\n".join(f'  "{column}" TEXT NOT NULL' for column in ADDITIVE_COLUMNS[1:])
+  statements = [
+    f"""
+CREATE TABLE IF NOT EXISTS additives (
+  code TEXT PRIMARY KEY,
+{additive_values},
+  updated_at TEXT NOT NULL DEFAULT ({NOW})
+)""",
+    "CREATE INDEX IF NOT EXISTS idx_additives_updated_at ON additives (updated_at)",
+    f"""
+CREATE TRIGGER IF NOT EXISTS additives_touch AFTER UPDATE ON additives
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+  UPDATE additives SET updated_at = {NOW} WHERE code = NEW.code;
+END""",
+    """
+CREATE TABLE IF NOT EXISTS pack_builds (
+  checksum TEXT PRIMARY KEY,
+  version TEXT NOT NULL,
+  built_at TEXT NOT NULL
+)""",
+  ]
+  for table, (_, keys, values) in CHILD_TABLES.items():
+    columns = ",\n".join(
+      ["  code TEXT NOT NULL REFERENCES additives (code) ON DELETE CASCADE"]
+      + [f'  "{column}" TEXT NOT NULL' for column in keys[1:] + values]
+    )
+    # The primary key leads with code, so it doubles as the per-additive index.
+    statements.append(
+      f"""
+CREATE TABLE IF NOT EXISTS {table} (
+{columns},
+  updated_at TEXT NOT NULL DEFAULT ({NOW}),
+  PRIMARY KEY ({_quoted(keys)})
+)"""
+    )
+    # Any edit to a child row marks the owning additive as changed.
+    for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+      statements.append(
+        f"""
+CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_touch AFTER {event} ON {table}
+BEGIN
+  UPDATE additives SET updated_at = {NOW} WHERE code = {row}.code;
+END"""
+      )
+  statements += [
+    "CREATE INDEX IF NOT EXISTS idx_synonyms_name ON synonyms (name)",
+    "CREATE INDEX IF NOT EXISTS idx_region_rules_region ON region_rules (region)",
+  ]
+  return ";\n".join(statements) + ";"
+
+
+def connect(db_path: Path | None = None) -> sqlite3.Connection:
+  path = db_path or DEFAULT_DB_PATH
+  path.parent.mkdir(parents=True, exist_ok=True)
+  conn = sqlite3.connect(path)
+  conn.row_factory = sqlite3.Row
+  conn.execute("PRAGMA journal_mode=WAL")
+  conn.execute("PRAGMA foreign_keys=ON")
+  conn.executescript(_schema())
+  return conn
+
+
+def _upsert(conn: sqlite3.Connection, table: str, keys: List[str], values: List[str], row: Dict[str, str]) -> None:
+  columns = keys + values
+  placeholders = ", ".join("?" for _ in columns)
+  if values:
+    # Skip no-op updates so unchanged rows keep their timestamps.
+    assignments = ", ".join(f'"{column}" = excluded."{column}"' for column in values)
+    changed = " OR ".join(f'{table}."{column}" IS NOT excluded."{column}"' for column in values)
+    conflict = f"DO UPDATE SET {assignments}, updated_at = {NOW} WHERE {changed}"
+  else:
+    conflict = "DO NOTHING"
+  conn.execute(
+    f"INSERT INTO {table} ({_quoted(columns)}) VALUES ({placeholders}) "
+    f"ON CONFLICT ({_quoted(keys)}) {conflict}",
+    [row[column] for column in columns],
+  )
+
+
+def _csv_rows(data_dir: Path, name: str) -> Iterator[Dict[str, str]]:
+  with (data_dir / name).open(newline="", encoding="utf-8") as handle:
+    yield from csv.DictReader(handle)
+
+
+def import_csv(conn: sqlite3.Connection, data_dir: Path | None = None) -> None:
+  """Syncs the store to the CSV sources, touching only rows that differ."""
+  source = data_dir or DATA_DIR
+  with conn:
+    codes = set()
+    for row in _csv_rows(source, "additives.csv"):
+      cleaned = {column: row[column].strip() for column in ADDITIVE_COLUMNS}
+      cleaned["code"] = cleaned["code"].upper()
+      codes.add(cleaned["code"])
+      _upsert(conn, "additives", ["code"], ADDITIVE_COLUMNS[1:], cleaned)
+
+    for table, (csv_name, keys, values) in CHILD_TABLES.items():
+      seen = set()
+      for row in _csv_rows(source, csv_name):
+        cleaned = {column: (row[column] or "").strip() for column in keys + values}
+        cleaned["code"] = cleaned["code"].upper()
+        if cleaned["code"] not in codes:
+          raise MasterStoreError(f"{csv_name} references unknown code {cleaned['code']}")
+        _upsert(conn, table, keys, values, cleaned)
+        seen.add(tuple(cleaned[key] for key in keys))
+      for existing in conn.execute(f"SELECT {_quoted(keys)} FROM {table}").fetchall():
+        if tuple(existing) not in seen:
+          where = " AND ".join(f'"{key}" = ?' for key in keys)
+          conn.execute(f"DELETE FROM {table} WHERE {where}", tuple(existing))
+
+    for (code,) in conn.execute("SELECT code FROM additives").fetchall():
+      if code not in codes:
+        conn.execute("DELETE FROM additives WHERE code = ?", (code,))
+
+
+def _rows(conn: sqlite3.Connection, table: str, columns: Sequence[str], codes: Optional[List[str]]) -> List[Dict[str, str]]:
+  query = f"SELECT {_quoted(columns)} FROM {table}"
+  params: List[str] = []
+  if codes is not None:
+    query += f" WHERE code IN ({', '.join('?' for _ in codes)})"
+    params = codes
+  return [dict(row) for row in conn.execute(query + " ORDER BY rowid", params)]
+
+
+def _materialize(
+  conn: sqlite3.Connection, codes: Optional[List[str]] = None
+) -> Tuple[List[Dict[str, object]], Dict[str, str]]:
+  child_rows = [
+    _rows(conn, table, keys + values, codes) for table, (_, keys, values) in CHILD_TABLES.items()
+  ]
+  return build_pack.materialize(_rows(conn, "additives", ADDITIVE_COLUMNS, codes), *child_rows)
+
+
+def build_from_store(conn: sqlite3.Connection, since: str | None = None) -> str:
+  """Builds a pack from the store; with ``since`` only changed additives are rebuilt.
+
+  Incremental builds start from the pack in ``output/``, which must be version
+  ``since`` and must have been built from this store. Builds are identified by
+  checksum because several builds on one day share a version.
+
+  The build holds the write lock from its first read until ``pack_builds`` is
+  committed, so no edit can land between the rows it reads and its ``built_at``.
+  The pack files are written only after that commit, so ``output/`` never holds
+  a pack the store has no record of.
+  """
+  with conn:
+    conn.execute("BEGIN IMMEDIATE")
+    build_started = conn.execute(f"SELECT {NOW}").fetchone()[0]
+    if since is None:
+      additives_payload, alias_index = _materialize(conn)
+      rebuilt = len(additives_payload)
+    else:
+      payload_path = OUTPUT_DIR / "payload.json"
+      previous = json.loads(payload_path.read_text(encoding="utf-8")) if payload_path.exists() else {}
+      if previous.get("version") != since:
+        raise MasterStoreError(f"output/payload.json is not pack version {since}; run a full build")
+      built = conn.execute(
+        "SELECT built_at FROM pack_builds WHERE checksum = ? AND version = ?", (previous.get("checksum"), since)
+      ).fetchone()
+      if built is None:
+        raise MasterStoreError(
+          f"output/payload.json (version {since}) was not built from this store; run a full build"
+        )
+
+      # >= rather than > so an edit landing in the same millisecond as the
+      # previous build is rebuilt rather than lost.
+      changed = [
+        row[0] for row in conn.execute("SELECT code FROM additives WHERE updated_at >= ?", (built["built_at"],))
+      ]
+      current = {row[0] for row in conn.execute("SELECT code FROM additives")}
+      fresh, fresh_aliases = _materialize(conn, changed) if changed else ([], {})
+      replaced = set(changed)
+      kept = [item for item in previous["additives"] if item["code"] in current and item["code"] not in replaced]
+      additives_payload = sorted(kept + fresh, key=lambda item: item["code"])  # type: ignore[arg-type,return-value]
+      alias_index = {
+        alias: code for alias, code in previous["alias_index"].items() if code in current and code not in replaced
+      }
+      alias_index.update(fresh_aliases)
+      rebuilt = len(fresh)
+
+    payload, meta = build_pack.stamp_pack(additives_payload, alias_index)
+    version = str(payload["version"])
+    conn.execute(
+      "INSERT INTO pack_builds (checksum, version, built_at) VALUES (?, ?, ?) "
+      "ON CONFLICT (checksum) DO UPDATE SET version = excluded.version, built_at = excluded.built_at",
+      (payload["checksum"], version, build_started),
+    )
+  build_pack.write_pack(payload, meta)
+  print(f"Built pack version {version} with {len(additives_payload)} additives ({rebuilt} rebuilt)")
+  return version
+
+
+def main(argv: List[str] | None = None) -> None:
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--db", type=Path, default=None, help=f"database path (default: {DEFAULT_DB_PATH})")
+  commands = parser.add_subparsers(dest="command", required=True)
+  importer = commands.add_parser("import", help="sync the store from CSV sources")
+  importer.add_argument("--data-dir", type=Path, default=None)
+  builder = commands.add_parser("build", help="build output/payload.json from the store")
+  builder.add_argument("--since", default=None, help="only rebuild additives changed since this pack version")
+  args = parser.parse_args(argv)
+
+  conn = connect(args.db)
+  try:
+    if args.command == "import":
+      import_csv(conn, args.data_dir)
+      count = conn.execute("SELECT COUNT(*) FROM additives").fetchone()[0]
+      print(f"Imported {count} additives into {args.db or DEFAULT_DB_PATH}")
+    else:
+      build_from_store(conn, since=args.since)
+  finally:
+    conn.close()
+
+
+if __name__ == "__main__":
+  main()
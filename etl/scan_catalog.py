@@ -0,0 +1,282 @@
+"""Matches a product catalog against a built pack using a process pool."""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from multiprocessing.pool import AsyncResult, Pool
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+ROOT = Path(__file__).resolve().parent
+OUTPUT_DIR = ROOT / "output"
+
+# Kept in step with mobile/src/data/parser.ts so offline scores match the app.
+REG_E = re.compile(r"\bE\s*0*(\d{3})([A-Z])?\b", re.IGNORECASE)
+REG_INS = re.compile(r"\bINS\s*0*(\d{3})([A-Z])?\b", re.IGNORECASE)
+SEGMENT_SPLIT = re.compile(r"[(),\\]")
+LEADING_KEYWORD_PATTERNS = [
+  re.compile(r"^(?:INGREDIENTS?|CONTAINS|MAY CONTAIN)[: ]+"),
+  re.compile(r"^CONTAINS[: ]+"),
+  re.compile(r"^INGREDIENTS?[: ]+"),
+]
+COMBINING_MARKS = re.compile("[\u0300-\u036f]")
+WHITESPACE = re.compile(r"\s+")
+MAX_REPORTED_SKIPS = 20
+
+Row = Tuple[str, str]
+
+
+def normalize(value: str) -> str:
+  value = unicodedata.normalize("NFKC", value).replace("\u200b", "").upper()
+  value = COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", value))
+  return WHITESPACE.sub(" ", value).strip()
+
+
+class CatalogMatcher:
+  """Resolves ingredient text to pack codes and the region rules they trigger."""
+
+  def __init__(self, pack: Dict[str, object]) -> None:
+    self.version = str(pack["version"])
+    self._codes = {additive["code"] for additive in pack["additives"]}  # type: ignore[index]
+    self._alias_index: Dict[str, str] = {}
+    for additive in pack["additives"]:  # type: ignore[union-attr]
+      for name in additive["names"]:
+        self._alias_index[normalize(name)] = additive["code"]
+    for alias, code in pack["alias_index"].items():  # type: ignore[union-attr]
+      self._alias_index.setdefault(normalize(alias), code)
+    self._region_rules: Dict[str, Dict[str, List[str]]] = {
+      additive["code"]: {
+        region: [rule["id"] for rule in rules] for region, rules in additive["region_rules"].items()
+      }
+      for additive in pack["additives"]  # type: ignore[union-attr]
+    }
+
+  @classmethod
+  def from_file(cls, path: Path) -> "CatalogMatcher":
+    return cls(json.loads(path.read_text(encoding="utf-8")))
+
+  def match(self, text: str) -> List[str]:
+    codes: Dict[str, None] = {}
+    for segment in SEGMENT_SPLIT.split(normalize(text)):
+      segment = segment.strip()
+      for pattern in LEADING_KEYWORD_PATTERNS:
+        segment = pattern.sub("", segment).strip()
+      if not segment:
+        continue
+      found = False
+      for regex in (REG_E, REG_INS):
+        for digits, suffix in regex.findall(segment):
+          found = True
+          canonical = f"E{digits}{suffix}"
+          if canonical in self._codes:
+            codes[canonical] = None
+      if not found:
+        code = self._alias_index.get(segment)
+        if code:
+          codes[code] = None
+    return sorted(codes)
+
+  def scan(self, product_id: str, text: str) -> Dict[str, object]:
+    codes = self.match(text)
+    regions: Dict[str, List[str]] = {}
+    for code in codes:
+      for region, rule_ids in self._region_rules.get(code, {}).items():
+        regions.setdefault(region, []).extend(rule_ids)
+    return {"id": product_id, "codes": codes, "regions": {key: regions[key] for key in sorted(regions)}}
+
+
+_worker_matcher: Optional[CatalogMatcher] = None
+
+
+def _init_worker(pack_path: str) -> None:
+  global _worker_matcher
+  _worker_matcher = CatalogMatcher.from_file(Path(pack_path))
+
+
+def _scan_chunk(rows: List[Row]) -> List[Dict[str, object]]:
+  assert _worker_matcher is not None, "worker was not initialised"
+  return [_worker_matcher.scan(product_id, text) for product_id, text in rows]
+
+
+def _read_rows(
+  handle: TextIO, fmt: str, id_field: str, text_field: str, stats: ScanStats, errors: TextIO | None
+) -> Iterator[Row]:
+  """Yields (id, text) pairs, skipping and counting rows that cannot be used."""
+
+  def skip(line: int, reason: str) -> None:
+    stats.skipped += 1
+    if errors is not None and stats.skipped <= MAX_REPORTED_SKIPS:
+      print(f"Skipping line {line}: {reason}", file=errors)
+
+  if fmt == "csv":
+    reader = csv.DictReader(handle)
+    for column in (id_field, text_field):
+      if reader.fieldnames is not None and column not in reader.fieldnames:
+        raise ValueError(f"Catalog has no {column!r} column")
+    for row in reader:
+      product_id = row.get(id_field)
+      if not product_id:
+        skip(reader.line_num, f"missing {id_field!r}")
+        continue
+      yield product_id, row.get(text_field) or ""
+    return
+
+  for line_number, line in enumerate(handle, start=1):
+    if not line.strip():
+      continue
+    try:
+      record = json.loads(line)
+    except ValueError as exc:
+      skip(line_number, f"invalid JSON ({exc})")
+      continue
+    if not isinstance(record, dict):
+      skip(line_number, "expected a JSON object")
+      continue
+    product_id = record.get(id_field)
+    if product_id is None or product_id == "":
+      skip(line_number, f"missing {id_field!r}")
+      continue
+    # Scoring a record without ingredient text as "no additives" would wipe its
+    # scores, so it is skipped instead. An explicit empty string is still scored.
+    if text_field not in record:
+      skip(line_number, f"missing {text_field!r}")
+      continue
+    yield str(product_id), str(record.get(text_field) or "")
+
+
+def _chunked(rows: Iterator[Row], size: int) -> Iterator[List[Row]]:
+  while True:
+    chunk = list(islice(rows, size))
+    if not chunk:
+      return
+    yield chunk
+
+
+def _ordered_results(pool: Pool, chunks: Iterator[List[Row]], window: int) -> Iterator[List[Dict[str, object]]]:
+  # Pool.imap drains its input eagerly; a bounded window keeps memory flat on
+  # multi-million row catalogs while preserving input order.
+  pending: Deque[AsyncResult] = deque()
+  for chunk in chunks:
+    pending.append(pool.apply_async(_scan_chunk, (chunk,)))
+    if len(pending) >= window:
+      yield pending.popleft().get()
+  while pending:
+    yield pending.popleft().get()
+
+
+@dataclass
+class ScanStats:
+  products: int = 0
+  matched: int = 0
+  skipped: int = 0
+  elapsed: float = 0.0
+
+  @property
+  def throughput(self) -> float:
+    return self.products / self.elapsed if self.elapsed else 0.0
+
+
+def scan_catalog(
+  catalog_path: Path,
+  output: TextIO,
+  pack_path: Path | None = None,
+  workers: int | None = None,
+  chunk_size: int = 2000,
+  fmt: str | None = None,
+  id_field: str = "id",
+  text_field: str = "ingredients",
+  progress: TextIO | None = None,
+  progress_every: int = 100000,
+) -> ScanStats:
+  pack = pack_path or (OUTPUT_DIR / "payload.json")
+  if not pack.exists():
+    raise FileNotFoundError(f"Pack payload not found at {pack}. Run build_pack.py first.")
+  fmt = fmt or ("csv" if catalog_path.suffix.lower() == ".csv" else "ndjson")
+  if fmt not in {"csv", "ndjson"}:
+    raise ValueError(f"Unsupported catalog format {fmt}")
+
+  stats = ScanStats()
+  started = time.perf_counter()
+  next_report = progress_every
+  with catalog_path.open(newline="", encoding="utf-8") as handle:
+    chunks = _chunked(_read_rows(handle, fmt, id_field, text_field, stats, progress), chunk_size)
+    pool = None
+    if workers == 1:
+      _init_worker(str(pack))
+      results: Iterable[List[Dict[str, object]]] = map(_scan_chunk, chunks)
+    else:
+      processes = workers or os.cpu_count() or 1
+      pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(str(pack),))
+      results = _ordered_results(pool, chunks, window=processes * 4)
+    try:
+      for batch in results:
+        for result in batch:
+          output.write(json.dumps(result, ensure_ascii=False, separators=(",", ":")))
+          output.write("\n")
+          if result["codes"]:
+            stats.matched += 1
+        stats.products += len(batch)
+        if progress is not None and stats.products >= next_report:
+          rate = stats.products / max(time.perf_counter() - started, 1e-9)
+          print(f"Scanned {stats.products} products ({rate:,.0f}/s)", file=progress)
+          next_report += progress_every
+    except BaseException:
+      if pool is not None:
+        pool.terminate()
+      raise
+    finally:
+      if pool is not None:
+        pool.close()
+        pool.join()
+  stats.elapsed = time.perf_counter() - started
+  return stats
+
+
+def main(argv: List[str] | None = None) -> ScanStats:
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("catalog", type=Path, help="CSV or NDJSON catalog of products")
+  parser.add_argument("--pack", type=Path, default=None, help="pack payload.json (default: output/payload.json)")
+  parser.add_argument("--output", "-o", default="-", help="NDJSON output path, '-' for stdout")
+  parser.add_argument("--workers", "-j", type=int, default=None, help="worker processes (default: CPU count)")
+  parser.add_argument("--chunk-size", type=int, default=2000)
+  parser.add_argument("--format", choices=["csv", "ndjson"], default=None, help="default: from file extension")
+  parser.add_argument("--id-field", default="id")
+  parser.add_argument("--text-field", default="ingredients")
+  args = parser.parse_args(argv)
+
+  output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+  try:
+    stats = scan_catalog(
+      args.catalog,
+      output,
+      pack_path=args.pack,
+      workers=args.workers,
+      chunk_size=args.chunk_size,
+      fmt=args.format,
+      id_field=args.id_field,
+      text_field=args.text_field,
+      progress=sys.stderr,
+    )
+  finally:
+    if output is not sys.stdout:
+      output.close()
+  print(
+    f"Scanned {stats.products} products ({stats.matched} with additives, {stats.skipped} bad rows skipped) "
+    f"in {stats.elapsed:.1f}s, {stats.throughput:,.0f} products/s",
+    file=sys.stderr,
+  )
+  return stats
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+
+class AdmissionRejected(RuntimeError):
+  """Raised when a request is shed instead of being admitted."""
+
+  def __init__(self, status_code: int, retry_after: float, detail: str) -> None:
+    super().__init__(detail)
+    self.status_code = status_code
+    self.retry_after = retry_after
+    self.detail = detail
+
+
+@dataclass
+class RoutePolicy:
+  """Limits for one route group; zero disables the corresponding check."""
+
+  concurrency: int = 0
+  queue_size: int = 0
+  rate_per_second: float = 0.0
+  burst: int = 0
+
+
+class TokenBucket:
+  """Classic token bucket refilled continuously at ``rate`` tokens per second."""
+
+  def __init__(self, rate: float, burst: int, now: float) -> None:
+    self._rate = rate
+    self._capacity = float(max(burst, 1))
+    self._tokens = self._capacity
+    self._updated = now
+
+  def try_acquire(self, now: float) -> float:
+    """Take a token and return 0, or return the seconds until one is available."""
+    elapsed = max(now - self._updated, 0.0)
+    self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+    self._updated = now
+    if self._tokens >= 1.0:
+      self._tokens -= 1.0
+      return 0.0
+    return (1.0 - self._tokens) / self._rate
+
+
+class ConcurrencyLimiter:
+  """Caps in-flight requests and parks a bounded number of waiters.
+
+  Waiters are futures on the caller's event loop, so a queued request holds no
+  worker thread while it waits for a slot.
+  """
+
+  def __init__(self, limit: int, queue_size: int) -> None:
+    self._limit = limit
+    self._queue_size = queue_size
+    self._active = 0
+    self._waiters: Deque[asyncio.Future] = deque()
+    self._lock = threading.Lock()
+
+  @property
+  def active(self) -> int:
+    return self._active
+
+  @property
+  def waiting(self) -> int:
+    return len(self._waiters)
+
+  async def acquire(self, timeout: float) -> bool:
+    loop = asyncio.get_running_loop()
+    with self._lock:
+      if self._active < self._limit:
+        self._active += 1
+        return True
+      if len(self._waiters) >= self._queue_size:
+        return False
+      waiter = loop.create_future()
+      self._waiters.append(waiter)
+    timer = loop.call_later(timeout, self._expire, waiter)
+    try:
+      return await waiter
+    except asyncio.CancelledError:
+      with self._lock:
+        queued = waiter in self._waiters
+        if queued:
+          self._waiters.remove(waiter)
+      if not queued and waiter.done() and not waiter.cancelled() and waiter.result():
+        self.release()
+      raise
+    finally:
+      timer.cancel()
+
+  def release(self) -> None:
+    with self._lock:
+      while self._waiters:
+        waiter = self._waiters.popleft()
+        if not waiter.done():
+          # Hand the slot straight to the next waiter; _active stays the same.
+          waiter.get_loop().call_soon_threadsafe(self._wake, waiter)
+          return
+      self._active -= 1
+
+  def _wake(self, waiter: asyncio.Future) -> None:
+    if waiter.done():
+      # The waiter was cancelled while the slot was in flight; pass it on.
+      self.release()
+    else:
+      waiter.set_result(True)
+
+  def _expire(self, waiter: asyncio.Future) -> None:
+    with self._lock:
+      if waiter not in self._waiters:
+        return
+      self._waiters.remove(waiter)
+    if not waiter.done():
+      waiter.set_result(False)
+
+
+class AdmissionController:
+  """Applies per-route concurrency limits and per-client rate limits."""
+
+  def __init__(
+    self,
+    policies: Dict[str, RoutePolicy],
+    queue_timeout: float,
+    retry_after: float,
+    max_clients: int = 10000,
+    clock: Callable[[], float] = time.monotonic,
+  ) -> None:
+    self._policies = policies
+    self._queue_timeout = queue_timeout
+    self._retry_after = retry_after
+    self._max_clients = max_clients
+    self._clock = clock
+    self._limiters = {
+      route: ConcurrencyLimiter(policy.concurrency, policy.queue_size)
+      for route, policy in policies.items()
+      if policy.concurrency > 0
+    }
+    self._buckets: "OrderedDict[tuple[str, str], TokenBucket]" = OrderedDict()
+    self._bucket_lock = threading.Lock()
+
+  def limiter(self, route: str) -> Optional[ConcurrencyLimiter]:
+    return self._limiters.get(route)
+
+  def _check_rate(self, route: str, policy: RoutePolicy, client_key: str) -> None:
+    if policy.rate_per_second <= 0:
+      return
+    key = (route, client_key)
+    with self._bucket_lock:
+      now = self._clock()
+      bucket = self._buckets.get(key)
+      if bucket is None:
+        bucket = TokenBucket(policy.rate_per_second, policy.burst, now)
+        self._buckets[key] = bucket
+        if len(self._buckets) > self._max_clients:
+          self._buckets.popitem(last=False)
+      else:
+        self._buckets.move_to_end(key)
+      wait = bucket.try_acquire(now)
+    if wait > 0:
+      raise AdmissionRejected(429, wait, f"Rate limit exceeded for {route}")
+
+  @asynccontextmanager
+  async def admit(self, route: str, client_key: str) -> AsyncIterator[None]:
+    policy = self._policies.get(route)
+    if policy is None:
+      yield
+      return
+    self._check_rate(route, policy, client_key)
+    limiter = self.limiter(route)
+    if limiter is None:
+      yield
+      return
+    if not await limiter.acquire(self._queue_timeout):
+      raise AdmissionRejected(503, self._retry_after, f"Too many concurrent {route} requests")
+    try:
+      yield
+    finally:
+      limiter.release()
+
+
+def retry_after_header(seconds: float) -> str:
+  return str(max(1, math.ceil(seconds)))
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+from collections import deque
 from functools import lru_cache
-from typing import List
+from typing import AsyncIterator, Callable, Deque, List
 
+from fastapi import Depends, HTTPException, Request
+
+from .admission import AdmissionController, AdmissionRejected, RoutePolicy, retry_after_header
 from .models import TelemetryEventModel
 from .pack_repository import PackRepository
 from .settings import get_settings
@@ -11,7 +15,11 @@ from .settings import get_settings
 @lru_cache(maxsize=1)
 def get_pack_repository() -> PackRepository:
   settings = get_settings()
-  return PackRepository(settings.pack_output_dir / "payload.json", settings.pack_output_dir / "meta.json")
+  return PackRepository(
+    settings.pack_output_dir / "payload.json",
+    settings.pack_output_dir / "meta.json",
+    cache_size=settings.lookup_cache_size,
+  )
 
 
 class TelemetryBuffer:
@@ -19,12 +27,10 @@ class TelemetryBuffer:
 
   def __init__(self, max_size: int) -> None:
     self._max_size = max_size
-    self._items: List[TelemetryEventModel] = []
+    self._items: Deque[TelemetryEventModel] = deque(maxlen=max_size)
 
   def append(self, event: TelemetryEventModel) -> None:
     self._items.append(event)
-    if len(self._items) > self._max_size:
-      self._items.pop(0)
 
   @property
   def items(self) -> List[TelemetryEventModel]:
@@ -38,3 +44,57 @@ class TelemetryBuffer:
 def get_telemetry_buffer() -> TelemetryBuffer:
   settings = get_settings()
   return TelemetryBuffer(settings.telemetry_buffer_size)
+
+
+@lru_cache(maxsize=1)
+def get_admission_controller() -> AdmissionController:
+  settings = get_settings()
+  policies = {}
+  if settings.admission_enabled:
+    policies = {
+      "telemetry": RoutePolicy(
+        concurrency=settings.telemetry_concurrency,
+        queue_size=settings.telemetry_queue_size,
+        rate_per_second=settings.telemetry_rate_per_second,
+        burst=settings.telemetry_rate_burst,
+      ),
+      "lookup": RoutePolicy(
+        concurrency=settings.lookup_concurrency,
+        queue_size=settings.lookup_queue_size,
+        rate_per_second=settings.lookup_rate_per_second,
+        burst=settings.lookup_rate_burst,
+      ),
+    }
+  return AdmissionController(
+    policies,
+    queue_timeout=settings.admission_queue_timeout,
+    retry_after=settings.admission_retry_after,
+  )
+
+
+def require_admission(route: str) -> Callable[..., AsyncIterator[None]]:
+  """Build a router dependency that holds an admission slot for ``route``.
+
+  The dependency is async so queued requests wait on the event loop instead
+  of occupying threadpool workers that sync handlers need.
+  """
+
+  async def dependency(
+    request: Request,
+    controller: AdmissionController = Depends(get_admission_controller),
+  ) -> AsyncIterator[None]:
+    header = get_settings().admission_client_header
+    client_key = (request.headers.get(header) if header else None) or (
+      request.client.host if request.client else "anonymous"
+    )
+    try:
+      async with controller.admit(route, client_key):
+        yield
+    except AdmissionRejected as exc:
+      raise HTTPException(
+        status_code=exc.status_code,
+        detail=exc.detail,
+        headers={"Retry-After": retry_after_header(exc.retry_after)},
+      ) from exc
+
+  return dependency
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+from .models import AdditiveModel
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_key(value: str) -> str:
+  """Canonical form used for code, alias and region lookups."""
+  return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", value).upper()).strip()
+
+
+class LRUCache(Generic[K, V]):
+  """Thread-safe bounded LRU cache with hit/miss/eviction counters.
+
+  ``None`` results are returned but never stored, so a stream of unknown keys
+  cannot push popular entries out.
+  """
+
+  def __init__(self, maxsize: int) -> None:
+    self._maxsize = maxsize
+    self._items: "OrderedDict[K, V]" = OrderedDict()
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def get_or_compute(self, key: K, compute: Callable[[K], V]) -> V:
+    with self._lock:
+      value = self._items.get(key, _MISSING)  # type: ignore[arg-type]
+      if value is not _MISSING:
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value  # type: ignore[return-value]
+      self.misses += 1
+    value = compute(key)
+    if value is None or self._maxsize <= 0:
+      return value
+    with self._lock:
+      self._items[key] = value
+      self._items.move_to_end(key)
+      while len(self._items) > self._maxsize:
+        self._items.popitem(last=False)
+        self.evictions += 1
+    return value
+
+  def stats(self) -> Dict[str, int]:
+    with self._lock:
+      return {
+        "hits": self.hits,
+        "misses": self.misses,
+        "evictions": self.evictions,
+        "size": len(self._items),
+        "maxsize": self._maxsize,
+      }
+
+
+class PackCaches:
+  """Lookup caches bound to one loaded pack version.
+
+  The repository swaps in a fresh instance on every refresh, so a reload drops
+  all cached entries at once and no lookup can mix two pack versions.
+  """
+
+  def __init__(
+    self,
+    version: str,
+    additive_index: Dict[str, AdditiveModel],
+    alias_index: Dict[str, str],
+    maxsize: int,
+  ) -> None:
+    self.version = version
+    self._additive_index = additive_index
+    self._alias_index = {normalize_key(alias): code for alias, code in alias_index.items()}
+    self._resolved: LRUCache[str, Optional[str]] = LRUCache(maxsize)
+    self._rendered: LRUCache[str, Optional[bytes]] = LRUCache(maxsize)
+
+  def resolve(self, name: str) -> Optional[str]:
+    """Map a code or alias to its additive code."""
+    return self._resolved.get_or_compute(normalize_key(name), self._resolve_normalized)
+
+  def _resolve_normalized(self, key: str) -> Optional[str]:
+    if key in self._additive_index:
+      return key
+    return self._alias_index.get(key)
+
+  def additive(self, name: str) -> Optional[AdditiveModel]:
+    code = self.resolve(name)
+    return self._additive_index.get(code) if code else None
+
+  def rendered(self, name: str) -> Optional[bytes]:
+    code = self.resolve(name)
+    if code is None:
+      return None
+    return self._rendered.get_or_compute(code, self._render)
+
+  def _render(self, code: str) -> Optional[bytes]:
+    additive = self._additive_index.get(code)
+    if additive is None:
+      return None
+    return additive.model_dump_json(by_alias=True).encode("utf-8")
+
+  def stats(self) -> Dict[str, object]:
+    return {
+      "pack_version": self.version,
+      "resolve": self._resolved.stats(),
+      "rendered": self._rendered.stats(),
+    }
@@ -9,8 +9,9 @@ from .routers import additives, packs, telemetry
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-  repo = get_pack_repository()
-  repo.refresh()
+  # Constructing the repository loads the pack; a second refresh here would
+  # only repeat that work.
+  get_pack_repository()
   yield
 
 
@@ -23,4 +24,4 @@ app.include_router(telemetry.router)
 @app.get("/healthz")
 def healthcheck():
   repo = get_pack_repository()
-  return {"status": "ok", "pack_version": repo.payload.version}
+  return {"status": "ok", "pack_version": repo.payload.version, "caches": repo.caches.stats()}
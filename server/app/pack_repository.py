@@ -3,20 +3,26 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Dict, Optional
 
+from .lookup_cache import PackCaches, normalize_key
 from .models import AdditiveModel, PackMetaModel, PackPayloadModel
 
 
 class PackRepository:
-  """Loads pack payloads from disk and exposes query helpers."""
+  """Loads pack payloads from disk and exposes query helpers.
 
-  def __init__(self, payload_path: Path, meta_path: Path) -> None:
+  Lookups go through LRU caches that are rebuilt with every refresh.
+  """
+
+  def __init__(self, payload_path: Path, meta_path: Path, cache_size: int = 1024) -> None:
     self._payload_path = payload_path
     self._meta_path = meta_path
+    self._cache_size = cache_size
     self._meta_by_version: Dict[str, PackMetaModel] = {}
     self._payload_by_version: Dict[str, PackPayloadModel] = {}
     self._additive_index: Dict[str, AdditiveModel] = {}
     self._region_latest: Dict[str, PackMetaModel] = {}
     self._latest_payload_version: Optional[str] = None
+    self._caches: Optional[PackCaches] = None
     self.refresh()
 
   def refresh(self) -> None:
@@ -27,9 +33,16 @@ class PackRepository:
     self._latest_payload_version = payload.version
     self._region_latest = {region.upper(): meta for region in meta.regions}
     self._additive_index = {item.code: item for item in payload.additives}
+    self._caches = PackCaches(payload.version, self._additive_index, payload.alias_index, self._cache_size)
+
+  @property
+  def caches(self) -> PackCaches:
+    if self._caches is None:
+      raise RuntimeError("Pack payload has not been loaded")
+    return self._caches
 
   def get_latest_meta(self, region: str) -> PackMetaModel:
-    region_key = region.upper()
+    region_key = normalize_key(region)
     if region_key not in self._region_latest:
       raise KeyError(f"Region {region} not available")
     return self._region_latest[region_key]
@@ -40,7 +53,12 @@ class PackRepository:
     return self._meta_by_version[version]
 
   def get_additive(self, code: str) -> Optional[AdditiveModel]:
-    return self._additive_index.get(code.upper())
+    """Look up an additive by code or any alias in the pack."""
+    return self.caches.additive(code)
+
+  def get_additive_json(self, code: str) -> Optional[bytes]:
+    """Like ``get_additive`` but returns the cached serialized response body."""
+    return self.caches.rendered(code)
 
   @property
   def payload(self) -> PackPayloadModel:
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 
-from ..deps import get_pack_repository
+from ..deps import get_pack_repository, require_admission
 from ..pack_repository import PackRepository
 
-router = APIRouter(prefix="/v1/additives", tags=["additives"])
+router = APIRouter(
+  prefix="/v1/additives",
+  tags=["additives"],
+  dependencies=[Depends(require_admission("lookup"))],
+)
 
 
 @router.get("/{code}")
 def get_additive(code: str, repo: PackRepository = Depends(get_pack_repository)):
-  additive = repo.get_additive(code)
-  if not additive:
+  body = repo.get_additive_json(code)
+  if body is None:
     raise HTTPException(status_code=404, detail=f"Additive {code} not found")
-  return additive
+  return Response(content=body, media_type="application/json")
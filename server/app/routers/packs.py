@@ -2,10 +2,14 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-from ..deps import get_pack_repository
+from ..deps import get_pack_repository, require_admission
 from ..pack_repository import PackRepository
 
-router = APIRouter(prefix="/v1/packs", tags=["packs"])
+router = APIRouter(
+  prefix="/v1/packs",
+  tags=["packs"],
+  dependencies=[Depends(require_admission("lookup"))],
+)
 
 
 @router.get("/latest")
@@ -2,10 +2,14 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, status
 
-from ..deps import TelemetryBuffer, get_telemetry_buffer
+from ..deps import TelemetryBuffer, get_telemetry_buffer, require_admission
 from ..models import TelemetryEventModel
 
-router = APIRouter(prefix="/v1/telemetry", tags=["telemetry"])
+router = APIRouter(
+  prefix="/v1/telemetry",
+  tags=["telemetry"],
+  dependencies=[Depends(require_admission("telemetry"))],
+)
 
 
 @router.post("", status_code=status.HTTP_202_ACCEPTED)
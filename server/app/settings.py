@@ -6,10 +6,36 @@ from functools import lru_cache
 from pathlib import Path
 
 
+def _env_int(name: str, default: int) -> int:
+  value = os.getenv(name)
+  return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+  value = os.getenv(name)
+  return float(value) if value else default
+
+
 @dataclass
 class Settings:
   pack_output_dir: Path
   telemetry_buffer_size: int = 1000
+  lookup_cache_size: int = 1024
+  # Admission control. A concurrency or rate of 0 disables that check. Rate
+  # limits key on the peer address unless admission_client_header names a
+  # header set by trusted infrastructure.
+  admission_enabled: bool = True
+  admission_client_header: str = ""
+  admission_queue_timeout: float = 0.25
+  admission_retry_after: float = 1.0
+  telemetry_concurrency: int = 8
+  telemetry_queue_size: int = 8
+  telemetry_rate_per_second: float = 0.0
+  telemetry_rate_burst: int = 20
+  lookup_concurrency: int = 64
+  lookup_queue_size: int = 128
+  lookup_rate_per_second: float = 0.0
+  lookup_rate_burst: int = 0
 
   @classmethod
   def from_env(cls) -> "Settings":
@@ -18,7 +44,23 @@ class Settings:
     telemetry = os.getenv("NS_TELEMETRY_BUFFER_SIZE")
     pack_path = Path(pack_dir).expanduser() if pack_dir else base_dir / "etl" / "output"
     buffer_size = int(telemetry) if telemetry else 1000
-    return cls(pack_output_dir=pack_path, telemetry_buffer_size=buffer_size)
+    return cls(
+      pack_output_dir=pack_path,
+      telemetry_buffer_size=buffer_size,
+      lookup_cache_size=_env_int("NS_LOOKUP_CACHE_SIZE", 1024),
+      admission_enabled=os.getenv("NS_ADMISSION_ENABLED", "true").strip().lower() in {"1", "true", "yes"},
+      admission_client_header=os.getenv("NS_ADMISSION_CLIENT_HEADER", "").strip(),
+      admission_queue_timeout=_env_float("NS_ADMISSION_QUEUE_TIMEOUT", 0.25),
+      admission_retry_after=_env_float("NS_ADMISSION_RETRY_AFTER", 1.0),
+      telemetry_concurrency=_env_int("NS_TELEMETRY_CONCURRENCY", 8),
+      telemetry_queue_size=_env_int("NS_TELEMETRY_QUEUE_SIZE", 8),
+      telemetry_rate_per_second=_env_float("NS_TELEMETRY_RATE_PER_SECOND", 0.0),
+      telemetry_rate_burst=_env_int("NS_TELEMETRY_RATE_BURST", 20),
+      lookup_concurrency=_env_int("NS_LOOKUP_CONCURRENCY", 64),
+      lookup_queue_size=_env_int("NS_LOOKUP_QUEUE_SIZE", 128),
+      lookup_rate_per_second=_env_float("NS_LOOKUP_RATE_PER_SECOND", 0.0),
+      lookup_rate_burst=_env_int("NS_LOOKUP_RATE_BURST", 0),
+    )
 
 
 @lru_cache(maxsize=1)
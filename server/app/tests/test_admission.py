@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from server.app.admission import AdmissionController, AdmissionRejected, ConcurrencyLimiter, RoutePolicy
+from server.app.deps import get_admission_controller
+from server.app.main import app
+from server.app.settings import get_settings
+
+TELEMETRY_EVENT = {"event": "scan_completed", "timestamp": "2025-01-01T00:00:00+00:00"}
+
+
+class FakeClock:
+  def __init__(self) -> None:
+    self.now = 0.0
+
+  def __call__(self) -> float:
+    return self.now
+
+
+async def _admit_once(controller: AdmissionController, route: str, client_key: str) -> None:
+  async with controller.admit(route, client_key):
+    pass
+
+
+def test_rate_limit_is_per_client_and_refills():
+  clock = FakeClock()
+  controller = AdmissionController(
+    {"telemetry": RoutePolicy(rate_per_second=2.0, burst=2)}, queue_timeout=0, retry_after=1, clock=clock
+  )
+  for _ in range(2):
+    asyncio.run(_admit_once(controller, "telemetry", "client-a"))
+  with pytest.raises(AdmissionRejected) as excinfo:
+    asyncio.run(_admit_once(controller, "telemetry", "client-a"))
+  assert excinfo.value.status_code == 429
+  assert excinfo.value.retry_after == pytest.approx(0.5)
+
+  asyncio.run(_admit_once(controller, "telemetry", "client-b"))
+  clock.now = 0.5
+  asyncio.run(_admit_once(controller, "telemetry", "client-a"))
+
+
+def test_concurrency_limit_sheds_when_queue_is_full():
+  controller = AdmissionController(
+    {"lookup": RoutePolicy(concurrency=1, queue_size=0)}, queue_timeout=0, retry_after=2
+  )
+
+  async def scenario() -> None:
+    async with controller.admit("lookup", "client"):
+      with pytest.raises(AdmissionRejected) as excinfo:
+        await _admit_once(controller, "lookup", "client")
+      assert excinfo.value.status_code == 503
+    await _admit_once(controller, "lookup", "client")
+
+  asyncio.run(scenario())
+
+
+def test_queued_waiter_times_out_or_receives_released_slot():
+  limiter = ConcurrencyLimiter(limit=1, queue_size=1)
+
+  async def scenario() -> None:
+    assert await limiter.acquire(timeout=0)
+    assert not await limiter.acquire(timeout=0.01)
+    assert limiter.waiting == 0
+
+    waiter = asyncio.ensure_future(limiter.acquire(timeout=1))
+    await asyncio.sleep(0)
+    assert limiter.waiting == 1
+    assert not await limiter.acquire(timeout=1)
+    limiter.release()
+    assert await waiter
+    assert limiter.active == 1
+    limiter.release()
+    assert limiter.active == 0
+
+  asyncio.run(scenario())
+
+
+def test_full_telemetry_queue_does_not_delay_lookups():
+  controller = AdmissionController(
+    {
+      "telemetry": RoutePolicy(concurrency=1, queue_size=40),
+      "lookup": RoutePolicy(concurrency=64, queue_size=128),
+    },
+    queue_timeout=2,
+    retry_after=1,
+  )
+  app.dependency_overrides[get_admission_controller] = lambda: controller
+
+  async def scenario() -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+      async with controller.admit("telemetry", "holder"):
+        posts = [asyncio.ensure_future(client.post("/v1/telemetry", json=TELEMETRY_EVENT)) for _ in range(40)]
+        limiter = controller.limiter("telemetry")
+        while limiter.waiting < 40:
+          await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        lookup = await client.get("/v1/additives/E102")
+        elapsed = time.perf_counter() - started
+        assert lookup.status_code == 200
+      responses = await asyncio.gather(*posts)
+    assert all(response.status_code == 202 for response in responses)
+    return elapsed
+
+  try:
+    assert asyncio.run(scenario()) < 0.5
+  finally:
+    app.dependency_overrides.pop(get_admission_controller, None)
+
+
+def test_rejections_return_retry_after(monkeypatch):
+  monkeypatch.setattr(get_settings(), "admission_client_header", "X-Client-Key")
+  controller = AdmissionController(
+    {"telemetry": RoutePolicy(rate_per_second=0.1, burst=1)}, queue_timeout=0, retry_after=1
+  )
+  app.dependency_overrides[get_admission_controller] = lambda: controller
+  try:
+    client = TestClient(app)
+    assert client.post("/v1/telemetry", json=TELEMETRY_EVENT, headers={"X-Client-Key": "a"}).status_code == 202
+    rejected = client.post("/v1/telemetry", json=TELEMETRY_EVENT, headers={"X-Client-Key": "a"})
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "10"
+    assert client.post("/v1/telemetry", json=TELEMETRY_EVENT, headers={"X-Client-Key": "b"}).status_code == 202
+    assert client.get("/v1/additives/E102").status_code == 200
+  finally:
+    app.dependency_overrides.pop(get_admission_controller, None)
+
+
+def test_client_header_is_ignored_unless_configured():
+  assert get_settings().admission_client_header == ""
+  assert get_settings().telemetry_rate_per_second == 0
+  controller = AdmissionController(
+    {"telemetry": RoutePolicy(rate_per_second=0.1, burst=1)}, queue_timeout=0, retry_after=1
+  )
+  app.dependency_overrides[get_admission_controller] = lambda: controller
+  try:
+    client = TestClient(app)
+    assert client.post("/v1/telemetry", json=TELEMETRY_EVENT, headers={"X-Client-Key": "a"}).status_code == 202
+    rotated = client.post("/v1/telemetry", json=TELEMETRY_EVENT, headers={"X-Client-Key": "b"})
+    assert rotated.status_code == 429
+  finally:
+    app.dependency_overrides.pop(get_admission_controller, None)
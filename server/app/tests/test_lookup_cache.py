@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from server.app.lookup_cache import LRUCache, normalize_key
+from server.app.main import app
+from server.app.pack_repository import PackRepository
+
+
+def test_lru_cache_counts_hits_misses_and_evictions():
+  cache: LRUCache[str, str] = LRUCache(maxsize=2)
+  calls = []
+
+  def compute(key: str) -> str:
+    calls.append(key)
+    return key.lower()
+
+  assert cache.get_or_compute("A", compute) == "a"
+  assert cache.get_or_compute("A", compute) == "a"
+  cache.get_or_compute("B", compute)
+  cache.get_or_compute("C", compute)
+  cache.get_or_compute("A", compute)
+
+  assert calls == ["A", "B", "C", "A"]
+  assert cache.stats() == {"hits": 1, "misses": 4, "evictions": 2, "size": 2, "maxsize": 2}
+
+
+def test_lru_cache_does_not_store_missing_results():
+  cache: LRUCache[str, None] = LRUCache(maxsize=2)
+  for _ in range(2):
+    assert cache.get_or_compute("unknown", lambda key: None) is None
+  assert cache.stats() == {"hits": 0, "misses": 2, "evictions": 0, "size": 0, "maxsize": 2}
+
+
+def test_normalize_key_folds_width_case_and_spacing():
+  assert normalize_key("  ｅ１０２ ") == "E102"
+  assert normalize_key("fd&c   yellow\t5") == "FD&C YELLOW 5"
+
+
+def test_repository_resolves_aliases_and_resets_caches_on_refresh(tmp_path):
+  root = Path(__file__).resolve().parents[3]
+  payload_path = tmp_path / "payload.json"
+  meta_path = tmp_path / "meta.json"
+  payload_path.write_text((root / "etl" / "output" / "payload.json").read_text(encoding="utf-8"), encoding="utf-8")
+  meta_path.write_text((root / "etl" / "output" / "meta.json").read_text(encoding="utf-8"), encoding="utf-8")
+
+  repo = PackRepository(payload_path, meta_path, cache_size=8)
+  assert repo.get_additive("tartrazine").code == "E102"
+  assert repo.get_additive(" e102 ").code == "E102"
+  assert repo.get_additive("unknown") is None
+  first = repo.get_additive_json("E102")
+  assert repo.get_additive_json("Tartrazine") is first
+  stats = repo.caches.stats()
+  assert stats["rendered"]["hits"] == 1
+  assert stats["resolve"]["misses"] == 3
+
+  for index in range(20):
+    assert repo.get_additive(f"NOISE{index}") is None
+  assert repo.get_additive_json("E102") is first
+  stats = repo.caches.stats()
+  assert stats["resolve"]["evictions"] == 0
+  assert stats["resolve"]["size"] == 2
+
+  payload_data = json.loads(payload_path.read_text(encoding="utf-8"))
+  payload_data["version"] = f"{payload_data['version']}-cache"
+  payload_data["additives"][0]["plain_summary"] = "Updated summary"
+  payload_path.write_text(json.dumps(payload_data), encoding="utf-8")
+  repo.refresh()
+
+  assert repo.caches.stats()["pack_version"] == payload_data["version"]
+  assert repo.caches.stats()["rendered"]["size"] == 0
+  assert json.loads(repo.get_additive_json("E102"))["plain_summary"] == "Updated summary"
+
+
+def test_additive_endpoint_accepts_aliases():
+  client = TestClient(app)
+  response = client.get("/v1/additives/Carmine")
+  assert response.status_code == 200
+  assert response.json()["code"] == "E120"
+  assert response.json()["class"] == "Colour"
+  assert client.get("/v1/additives/E999").status_code == 404
+  assert "caches" in client.get("/healthz").json()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from etl import build_pack, master_store
+
+OUTPUT_DIR = Path(__file__).resolve().parents[3] / "etl" / "output"
+
+
+def _load_payload() -> dict:
+  payload = json.loads((OUTPUT_DIR / "payload.json").read_text(encoding="utf-8"))
+  for key in ("version", "generated_at", "checksum"):
+    payload.pop(key)
+  return payload
+
+
+def test_store_build_matches_csv_build(tmp_path):
+  build_pack.build_pack()
+  expected = _load_payload()
+
+  conn = master_store.connect(tmp_path / "master.sqlite3")
+  try:
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    master_store.import_csv(conn)
+    stamps = dict(conn.execute("SELECT code, updated_at FROM additives").fetchall())
+    master_store.import_csv(conn)
+    assert dict(conn.execute("SELECT code, updated_at FROM additives").fetchall()) == stamps
+
+    master_store.build_from_store(conn)
+    assert _load_payload() == expected
+  finally:
+    conn.close()
+
+
+def test_incremental_build_rebuilds_changed_additives(tmp_path):
+  conn = master_store.connect(tmp_path / "master.sqlite3")
+  try:
+    master_store.import_csv(conn)
+    version = master_store.build_from_store(conn)
+    before = {item["code"]: item for item in _load_payload()["additives"]}
+
+    with conn:
+      conn.execute("UPDATE additives SET plain_summary = 'Edited' WHERE code = 'E120'")
+      conn.execute("INSERT INTO synonyms (code, name) VALUES ('E330', 'Lemon acid')")
+
+    master_store.build_from_store(conn, since=version)
+    after = _load_payload()
+    by_code = {item["code"]: item for item in after["additives"]}
+    assert by_code["E120"]["plain_summary"] == "Edited"
+    assert "LEMON ACID" in by_code["E330"]["names"]
+    assert after["alias_index"]["LEMON ACID"] == "E330"
+    assert by_code["E102"] == before["E102"]
+
+    with conn:
+      conn.execute("DELETE FROM additives WHERE code = 'E120'")
+    master_store.build_from_store(conn, since=version)
+    after = _load_payload()
+    assert "E120" not in {item["code"] for item in after["additives"]}
+    assert "E120" not in after["alias_index"].values()
+
+    with pytest.raises(master_store.MasterStoreError):
+      master_store.build_from_store(conn, since="1999.01.01")
+  finally:
+    conn.close()
+    build_pack.build_pack()
+
+
+def test_incremental_build_rejects_pack_not_built_from_store(tmp_path):
+  conn = master_store.connect(tmp_path / "master.sqlite3")
+  try:
+    master_store.import_csv(conn)
+    with conn:
+      conn.execute("UPDATE additives SET plain_summary = 'Store only' WHERE code = 'E102'")
+    version = master_store.build_from_store(conn)
+
+    build_pack.build_pack()
+    assert json.loads((OUTPUT_DIR / "payload.json").read_text(encoding="utf-8"))["version"] == version
+    with pytest.raises(master_store.MasterStoreError, match="not built from this store"):
+      master_store.build_from_store(conn, since=version)
+  finally:
+    conn.close()
+    build_pack.build_pack()
+
+
+def test_build_waits_for_open_curator_transaction(tmp_path):
+  db_path = tmp_path / "master.sqlite3"
+  conn = master_store.connect(db_path)
+  curator = sqlite3.connect(db_path, check_same_thread=False)
+  try:
+    master_store.import_csv(conn)
+    version = master_store.build_from_store(conn)
+
+    curator.execute("UPDATE additives SET plain_summary = 'Curator edit' WHERE code = 'E120'")
+    threading.Timer(0.2, curator.commit).start()
+    master_store.build_from_store(conn, since=version)
+    by_code = {item["code"]: item for item in _load_payload()["additives"]}
+    assert by_code["E120"]["plain_summary"] == "Curator edit"
+  finally:
+    curator.close()
+    conn.close()
+    build_pack.build_pack()
+
+
+def test_failed_build_leaves_output_untouched(tmp_path):
+  conn = master_store.connect(tmp_path / "master.sqlite3")
+  try:
+    master_store.import_csv(conn)
+    version = master_store.build_from_store(conn)
+    before = (OUTPUT_DIR / "payload.json").read_bytes()
+
+    with conn:
+      conn.execute("UPDATE additives SET plain_summary = 'Edited' WHERE code = 'E120'")
+      conn.execute(
+        "CREATE TEMP TRIGGER fail_record BEFORE INSERT ON pack_builds BEGIN SELECT RAISE(ABORT, 'boom'); END"
+      )
+    with pytest.raises(sqlite3.IntegrityError):
+      master_store.build_from_store(conn, since=version)
+    assert (OUTPUT_DIR / "payload.json").read_bytes() == before
+    assert not list(OUTPUT_DIR.glob("*.tmp"))
+
+    with conn:
+      conn.execute("DROP TRIGGER fail_record")
+    master_store.build_from_store(conn, since=version)
+    by_code = {item["code"]: item for item in _load_payload()["additives"]}
+    assert by_code["E120"]["plain_summary"] == "Edited"
+  finally:
+    conn.close()
+    build_pack.build_pack()
@@ -3,6 +3,10 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+from fastapi.testclient import TestClient
+
+from server.app import deps
+from server.app.main import app
 from server.app.pack_repository import PackRepository
 
 
@@ -34,3 +38,21 @@ def test_refresh_updates_payload_version(tmp_path):
   for region in meta_data["regions"]:
     assert repo.get_latest_meta(region).version == new_version
   assert repo.get_meta(original_version).version == original_version
+
+
+def test_startup_loads_pack_once(monkeypatch):
+  calls = []
+  original_refresh = PackRepository.refresh
+
+  def counting_refresh(self):
+    calls.append(self)
+    original_refresh(self)
+
+  monkeypatch.setattr(PackRepository, "refresh", counting_refresh)
+  deps.get_pack_repository.cache_clear()
+  try:
+    with TestClient(app):
+      pass
+    assert len(calls) == 1
+  finally:
+    deps.get_pack_repository.cache_clear()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from etl import build_pack, scan_catalog
+
+
+def test_scan_catalog_matches_codes_and_aliases(tmp_path):
+  build_pack.build_pack()
+  catalog = tmp_path / "catalog.ndjson"
+  rows = [
+    {"id": "p1", "ingredients": "Ingredients: sugar, colour (E 102), citric acid"},
+    {"id": "p2", "ingredients": "water, Carmine, salt"},
+    {"id": "p3", "ingredients": "flour, yeast"},
+    {"id": "p4", "ingredients": "INS 330"},
+  ]
+  catalog.write_text("\n".join(json.dumps(row) for row in rows), encoding="utf-8")
+
+  results = {}
+  for workers in (1, 2):
+    output = io.StringIO()
+    stats = scan_catalog.scan_catalog(catalog, output, workers=workers, chunk_size=1)
+    assert stats.products == 4
+    assert stats.matched == 3
+    results[workers] = [json.loads(line) for line in output.getvalue().splitlines()]
+
+  assert results[1] == results[2]
+  by_id = {item["id"]: item for item in results[1]}
+  assert [item["id"] for item in results[1]] == ["p1", "p2", "p3", "p4"]
+  assert by_id["p1"]["codes"] == ["E102", "E330"]
+  assert "EU-AZO-CHILD" in by_id["p1"]["regions"]["EU"]
+  assert by_id["p2"]["codes"] == ["E120"]
+  assert by_id["p3"] == {"id": "p3", "codes": [], "regions": {}}
+  assert by_id["p4"]["codes"] == ["E330"]
+
+
+def test_scan_catalog_skips_and_reports_bad_rows(tmp_path):
+  build_pack.build_pack()
+  catalog = tmp_path / "catalog.ndjson"
+  catalog.write_text(
+    "\n".join(
+      [
+        json.dumps({"id": "p1", "ingredients": "E102"}),
+        "{not json",
+        json.dumps({"ingredients": "Carmine"}),
+        json.dumps(["p4", "E330"]),
+        json.dumps({"id": "p5", "ingredients": "citric acid"}),
+        json.dumps({"id": "p6", "ingredient_list": "E102"}),
+      ]
+    ),
+    encoding="utf-8",
+  )
+  output = io.StringIO()
+  errors = io.StringIO()
+  stats = scan_catalog.scan_catalog(catalog, output, workers=2, chunk_size=1, progress=errors)
+
+  assert stats.products == 2
+  assert stats.skipped == 4
+  assert [json.loads(line)["id"] for line in output.getvalue().splitlines()] == ["p1", "p5"]
+  report = errors.getvalue()
+  assert "line 2: invalid JSON" in report
+  assert "line 3: missing 'id'" in report
+  assert "line 4: expected a JSON object" in report
+  assert "line 6: missing 'ingredients'" in report
+
+
+def test_scan_catalog_skips_csv_rows_without_id(tmp_path):
+  build_pack.build_pack()
+  catalog = tmp_path / "catalog.csv"
+  catalog.write_text('id,ingredients\np1,E102\n,"Carmine, salt"\np3,E330\n', encoding="utf-8")
+  output = io.StringIO()
+  errors = io.StringIO()
+  stats = scan_catalog.scan_catalog(catalog, output, workers=1, progress=errors)
+
+  assert (stats.products, stats.skipped) == (2, 1)
+  assert "line 3: missing 'id'" in errors.getvalue()
+
+
+def test_scan_catalog_rejects_csv_without_text_column(tmp_path):
+  build_pack.build_pack()
+  catalog = tmp_path / "catalog.csv"
+  catalog.write_text("id,ingredient_list\np1,E102\n", encoding="utf-8")
+  output = io.StringIO()
+  with pytest.raises(ValueError, match="no 'ingredients' column"):
+    scan_catalog.scan_catalog(catalog, output, workers=1)
+  assert output.getvalue() == ""